@@ -1,8 +1,438 @@
 #!/usr/bin/env python3
 
 import re
+import string
 import sys
 import math
+import operator
+from array import array
+
+# Bytecode opcodes. Every instruction is two words: the opcode and its argument.
+OP_PRINT_LITERAL = 0 # write consts[arg], fixed text that already ends in a newline
+OP_PRINT_INTERP = 1  # print the interpolation template consts[arg]
+OP_PRINT_VALUE = 2   # pop a value and print it
+OP_LOAD_CONST = 3    # push the pre-parsed literal consts[arg]
+OP_STORE_VAR = 4     # pop a value into the variable names[arg]
+OP_ADD = 5           # pop right and left, store left + right into names[arg]
+OP_SUB = 6           # pop right and left, store left - right into names[arg]
+OP_MUL = 7           # pop right and left, store left * right into names[arg]
+OP_DIV = 8           # pop right and left, store left / right into names[arg]
+OP_BAD_OP = 9        # pop right and left, report the unknown operation consts[arg]
+OP_ASK = 10          # read user input into the variable names[arg]
+OP_LOOP = 11         # pop end and start, push a loop frame (consts[arg] is the bounds error)
+OP_END_LOOP = 12     # advance the innermost loop and jump back to its body
+OP_IMPORT_MATH = 13  # import the math module
+OP_HELP = 14         # show help
+OP_EXIT = 15         # stop the program
+OP_LOOP_SUM = 16     # OP_LOOP for a 'set v to v plus i' body; consts[arg] is (bounds error, v, exit ip)
+OP_LOAD_VAR = 17     # push the variable names[arg], or its literal value if unset
+OP_LOAD_INTERP = 18  # render the template consts[arg], then push it as a variable or literal
+OP_STORE_CONST = 19  # consts[arg] is (name, value); store the folded value into the variable
+
+# Matches $variable$ interpolation markers
+_INTERP_RE = re.compile(r'\$([a-zA-Z0-9_]+)\$')
+_NAME_CHARS = frozenset(string.ascii_letters + string.digits + '_')
+
+# Cache-miss sentinel, distinct from any literal value
+_MISS = object()
+
+MATH_FUNCTIONS = {
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "sqrt": math.sqrt,
+    "log": math.log,
+    "floor": math.floor,
+    "ceil": math.ceil,
+}
+
+# Command and syntax keywords, interned so token comparisons and lookups hit on identity
+_KW_PRINT = sys.intern("print")
+_KW_SET = sys.intern("set")
+_KW_TO = sys.intern("to")
+_KW_ASK = sys.intern("ask")
+_KW_FOR = sys.intern("for")
+_KW_LOOP = sys.intern("loop")
+_KW_THROUGH = sys.intern("through")
+_KW_AND = sys.intern("and")
+_KW_END = sys.intern("end")
+_KW_IMPORT = sys.intern("import")
+_KW_IF = sys.intern("if")
+_KW_EXIT = sys.intern("exit")
+_KW_QUIT = sys.intern("quit")
+_KW_HELP = sys.intern("help")
+_KW_PLUS = sys.intern("plus")
+_KW_MINUS = sys.intern("minus")
+_KW_TIMES = sys.intern("times")
+_KW_DIVIDED = sys.intern("divided")
+_KW_BY = sys.intern("by")
+_KW_MATH = sys.intern("math")
+
+# Token positions that hold keywords for each command, lowercased by tokenize
+KEYWORD_SLOTS = {
+    _KW_SET: (2, 4),   # set variable to value [operation value]
+    _KW_ASK: (1,),     # ask for variable
+    _KW_LOOP: (1, 3),  # loop through start and end
+    _KW_END: (1,),     # end loop
+    _KW_IMPORT: (1,),  # import module
+}
+
+ARITH_OPS = {
+    _KW_PLUS: OP_ADD,
+    _KW_MINUS: OP_SUB,
+    _KW_TIMES: OP_MUL,
+}
+
+# Python operators used to fold arithmetic on literals at compile time
+FOLD_OPS = {
+    OP_ADD: operator.add,
+    OP_SUB: operator.sub,
+    OP_MUL: operator.mul,
+    OP_DIV: operator.truediv,
+}
+
+_HELP_TEXT = """
+SudoSharp Language Help
+======================
+Commands:
+  print [text/$variable$/etc] - Output text to console. Use $var$ for variable interpolation.
+  set variable to value - Assign a value to a variable
+  ask for variable - Get user input and store it in a variable
+  loop through start and end - Loop from start to end values
+  end loop - End a loop block
+  import module - Import a module (currently only 'math' is supported)
+  exit/quit - Exit the program
+  help - Show this help message
+
+Math Operations:
+  set result to value1 plus value2
+  set result to value1 minus value2
+  set result to value1 times value2
+  set result to value1 divided by value2
+
+Built-in Functions:
+  abs, max, min, sum, round, pow, int, float, str, len, sort
+
+Comments:
+  $ This is a comment
+  # This is also a comment
+"""
+
+def compile_template(text):
+    """Split text into ('lit', text) and ('var', name) interpolation fragments"""
+    template = []
+    for index, part in enumerate(_INTERP_RE.split(text)):
+        if index % 2:
+            template.append(('var', part))
+        elif part:
+            template.append(('lit', part))
+    return template
+
+def parse_literal(expr):
+    """Evaluate a token that is not a variable reference"""
+    # Handle quoted strings
+    if isinstance(expr, str) and expr.startswith('"') and expr.endswith('"'):
+        return expr[1:-1]
+    
+    # Handle numbers
+    try:
+        if isinstance(expr, str):
+            if '.' in expr:
+                return float(expr)
+            else:
+                return int(expr)
+        return expr  # Already a number
+    except ValueError:
+        pass
+    
+    # Handle boolean
+    if isinstance(expr, str):
+        if expr.lower() == "yes" or expr.lower() == "true":
+            return True
+        if expr.lower() == "no" or expr.lower() == "false":
+            return False
+        
+    return expr  # Return as is if nothing else matched
+
+def sum_range(start, end):
+    """Sum of the integers start..end inclusive"""
+    return (start + end) * (end - start + 1) // 2
+
+class Compiler:
+    """Compile SudoSharp program lines into a flat bytecode array"""
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.code = []
+        self.consts = []
+        self.names = []
+        self.defaults = []  # literal value of each name, used while it is unset
+        self.name_index = {}
+        self.assigned = set()
+        self.open_loops = []  # ips of loop headers still waiting for their 'end loop'
+        self.loop_match = {}  # loop header ip -> ip of its matching OP_END_LOOP
+        
+        # Compile handlers keyed by lowercased command
+        self._dispatch = {
+            _KW_PRINT: self.compile_print,
+            _KW_SET: self.compile_set,
+            _KW_ASK: self.compile_ask,
+            _KW_LOOP: self.compile_loop,
+            _KW_END: self._compile_end,
+            _KW_IMPORT: self.compile_import,
+            _KW_IF: self._compile_if,
+            _KW_EXIT: self._compile_exit,
+            _KW_QUIT: self._compile_exit,
+            _KW_HELP: self._compile_help,
+        }
+
+    def emit(self, op, arg=0):
+        """Append one instruction to the code stream"""
+        self.code.append(op)
+        self.code.append(arg)
+
+    def const(self, value):
+        """Add a value to the constants pool and return its index"""
+        self.consts.append(value)
+        return len(self.consts) - 1
+
+    def name(self, name):
+        """Return the names pool index of a variable name"""
+        index = self.name_index.get(name)
+        if index is None:
+            index = self.name_index[name] = len(self.names)
+            self.names.append(name)
+            self.defaults.append(parse_literal(name))
+        return index
+
+    def emit_print(self, text):
+        """Emit a print of fixed text"""
+        self.emit(OP_PRINT_LITERAL, self.const(text + '\n'))
+
+    def literal(self, token):
+        """Return the compile-time value of a literal token, or _MISS if it can change"""
+        if '$' in token or token in self.assigned:
+            return _MISS
+        # Nothing can ever bind this name, so it is always a literal
+        return parse_literal(token)
+
+    def emit_load(self, token):
+        """Emit code that pushes the value of an operand token"""
+        if '$' in token:
+            self.emit(OP_LOAD_INTERP, self.const(compile_template(token)))
+        elif token in self.assigned:
+            self.emit(OP_LOAD_VAR, self.name(token))
+        else:
+            self.emit(OP_LOAD_CONST, self.const(self.literal(token)))
+
+    def emit_store_const(self, name, value):
+        """Emit a store of a value known at compile time"""
+        self.emit(OP_STORE_CONST, self.const((name, value)))
+
+    def fold_binary(self, target, opcode, op, left_token, right_token):
+        """Emit the outcome of an operation on two literals; returns False if it needs runtime code"""
+        left = self.literal(left_token)
+        right = self.literal(right_token)
+        if left is _MISS or right is _MISS:
+            return False
+        
+        try:
+            if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+                if opcode == OP_DIV:
+                    self.emit_print(f"Error: Cannot perform division on non-numeric values: {left} and {right}")
+                else:
+                    self.emit_print(f"Error: Cannot perform math operations on non-numeric values: {left} and {right}")
+            elif opcode is None:
+                self.emit_print(f"Error: Unknown operation '{op}'")
+            elif opcode == OP_DIV and right == 0:
+                self.emit_print("Error: Division by zero")
+            else:
+                self.emit_store_const(target, FOLD_OPS[opcode](left, right))
+        except (ArithmeticError, ValueError):
+            # e.g. an int too large for float; raise it at runtime, in program order
+            return False
+        return True
+
+    def compile(self, lines):
+        """Compile program lines, returning (code, consts, names, defaults)"""
+        program = []
+        for line in lines:
+            # Blank and comment lines tokenize to nothing and emit no code, so
+            # loops that wrap them never revisit them at runtime
+            tokens = self.interpreter.prepare_line(line)
+            if tokens:
+                program.append((tokens[0], tokens))
+        
+        self.assigned = self.assigned_names(program)
+        for command, tokens in program:
+            self.compile_tokens(command, tokens)
+        self.optimize()
+        return array('i', self.code), self.consts, self.names, self.defaults
+
+    def assigned_names(self, program):
+        """Collect every name that may hold a variable while the program runs"""
+        assigned = set(self.interpreter.variables)
+        assigned.add("i")
+        assigned.update(MATH_FUNCTIONS)
+        for command, tokens in program:
+            if command == _KW_SET and len(tokens) > 1:
+                assigned.add(tokens[1])
+            elif command == _KW_ASK and len(tokens) > 2:
+                assigned.add(tokens[2])
+        return assigned
+
+    def optimize(self):
+        """Peephole pass over the emitted code"""
+        code = self.code
+        consts = self.consts
+        names = self.names
+        
+        # A loop whose body is LOAD v; LOAD i; ADD v is a running sum over the loop range
+        for ip, end_ip in self.loop_match.items():
+            if (end_ip != ip + 8 or code[ip + 2] != OP_LOAD_VAR or code[ip + 4] != OP_LOAD_VAR
+                    or code[ip + 6] != OP_ADD):
+                continue
+            target = names[code[ip + 7]]
+            operands = {names[code[ip + 3]], names[code[ip + 5]]}
+            if target == "i" or '$' in target or operands != {target, "i"}:
+                continue
+            code[ip + 1] = self.const((consts[code[ip + 1]], code[ip + 7], end_ip + 2))
+            code[ip] = OP_LOOP_SUM
+
+    def compile_tokens(self, command, tokens):
+        """Compile a single tokenized line"""
+        handler = self._dispatch.get(command)
+        if handler:
+            handler(tokens)
+        else:
+            self._unknown(command)
+
+    def _compile_end(self, tokens):
+        """Compile end command; only 'end loop' is valid"""
+        if len(tokens) > 1 and tokens[1] == _KW_LOOP:
+            if self.open_loops:
+                self.loop_match[self.open_loops.pop()] = len(self.code)
+            self.emit(OP_END_LOOP)
+        else:
+            self._unknown(_KW_END)
+
+    def _compile_if(self, tokens):
+        """Compile if statement (simplified)"""
+        self.emit_print("If statements are not yet implemented")
+
+    def _compile_exit(self, tokens):
+        """Compile exit/quit command"""
+        self.emit(OP_EXIT)
+
+    def _compile_help(self, tokens):
+        """Compile help command"""
+        self.emit(OP_HELP)
+
+    def _unknown(self, command):
+        """Compile the error for an unknown command"""
+        self.emit_print(f"Error: Unknown command '{command}'")
+
+    def compile_print(self, tokens):
+        """Compile print command"""
+        if len(tokens) < 2:
+            self.emit_print("")
+            return
+        
+        if '$' in tokens[1]:
+            self.emit(OP_PRINT_INTERP, self.const(compile_template(tokens[1])))
+            return
+        
+        if len(tokens) == 2 and tokens[1].startswith('"') and tokens[1].endswith('"'):
+            self.emit_print(tokens[1][1:-1])
+            return
+        
+        value = self.literal(tokens[1])
+        if value is not _MISS:
+            self.emit_print(str(value).rstrip())
+            return
+        
+        self.emit_load(tokens[1])
+        self.emit(OP_PRINT_VALUE)
+
+    def compile_set(self, tokens):
+        """Compile variable assignment"""
+        if len(tokens) < 4 or tokens[2] != _KW_TO:
+            self.emit_print("Error: Invalid set command format. Use 'set variable to value'")
+            return
+        
+        target = tokens[1]
+        value_tokens = tokens[3:]
+        
+        if len(value_tokens) == 1:
+            value = self.literal(value_tokens[0])
+            if value is _MISS:
+                self.emit_load(value_tokens[0])
+                self.emit(OP_STORE_VAR, self.name(target))
+            else:
+                self.emit_store_const(target, value)
+            return
+        
+        if len(value_tokens) >= 3:
+            op = value_tokens[1]
+            
+            if op == _KW_DIVIDED and value_tokens[2] == _KW_BY:
+                if len(value_tokens) < 4:
+                    self.emit_print("Error: Invalid division format. Use 'divided by value'")
+                    return
+                opcode = OP_DIV
+                right_token = value_tokens[3]
+            else:
+                opcode = ARITH_OPS.get(op)
+                right_token = value_tokens[2]
+            
+            if self.fold_binary(target, opcode, op, value_tokens[0], right_token):
+                return
+            
+            self.emit_load(value_tokens[0])
+            self.emit_load(right_token)
+            if opcode is None:
+                self.emit(OP_BAD_OP, self.const(op))
+            else:
+                self.emit(opcode, self.name(target))
+
+    def compile_ask(self, tokens):
+        """Compile input command"""
+        if len(tokens) < 3 or tokens[1] != _KW_FOR:
+            self.emit_print("Error: Invalid ask command format. Use 'ask for variable'")
+            return
+        self.emit(OP_ASK, self.name(tokens[2]))
+
+    def compile_loop(self, tokens):
+        """Compile loop command"""
+        if len(tokens) < 5 or tokens[1] != _KW_THROUGH or tokens[3] != _KW_AND:
+            self.emit_print("Error: Invalid loop command format. Use 'loop through start and end'")
+            return
+        self.emit_bound(tokens[2])
+        self.emit_bound(tokens[4])
+        self.open_loops.append(len(self.code))
+        self.emit(OP_LOOP, self.const(f"Error: Loop bounds must be integers, got {tokens[2]} and {tokens[4]}"))
+
+    def emit_bound(self, token):
+        """Emit a loop bound, converting a literal bound to int at compile time"""
+        value = self.literal(token)
+        if value is not _MISS:
+            try:
+                self.emit(OP_LOAD_CONST, self.const(int(value)))
+                return
+            except (ValueError, TypeError, OverflowError):
+                pass  # reported by OP_LOOP at runtime, as before
+        self.emit_load(token)
+
+    def compile_import(self, tokens):
+        """Compile import command"""
+        if len(tokens) < 2:
+            self.emit_print("Error: Invalid import command. Use 'import module'")
+            return
+        
+        module_name = tokens[1]
+        if module_name == _KW_MATH:
+            self.emit(OP_IMPORT_MATH)
+        else:
+            self.emit_print(f"Error: Module '{module_name}' not found")
 
 class SudoSharpInterpreter:
     def __init__(self):
@@ -10,7 +440,27 @@ class SudoSharpInterpreter:
         self.running = True
         self.program_lines = []
         self.current_line = 0
-        self.loop_stack = []
+        # Active loops as parallel stacks: loop line, iterator and end value
+        self.loop_starts = []
+        self.loop_iters = []
+        self.loop_ends = []
+        self.compiled = None
+        self._literal_cache = {}  # token -> parse_literal(token)
+        self._write = sys.stdout.write
+        
+        # Command handlers keyed by lowercased command
+        self._dispatch = {
+            _KW_PRINT: self.execute_print,
+            _KW_SET: self.execute_set,
+            _KW_ASK: self.execute_ask,
+            _KW_LOOP: self.execute_loop,
+            _KW_END: self._execute_end,
+            _KW_IMPORT: self.execute_import,
+            _KW_IF: self.execute_if,
+            _KW_EXIT: self._execute_exit,
+            _KW_QUIT: self._execute_exit,
+            _KW_HELP: self._execute_help,
+        }
         
         # Initialize built-in functions and variables
         self.init_builtins()
@@ -39,24 +489,27 @@ class SudoSharpInterpreter:
         self.variables["sort"] = sorted
 
     def tokenize(self, line):
-        """Split the line into tokens while preserving quoted strings"""
+        """Split the line into tokens while preserving quoted strings; bare tokens are interned"""
+        stripped = line.strip()
+        
         # Check if this is a comment line
-        if line.strip().startswith('$') and not line.strip().lower().startswith('$print'):
+        if stripped[:1] == '$' and stripped[:6].lower() != '$print':
             return []  # Skip comment lines
             
-        tokens = []
-        i = 0
-        
         # Special handling for print with interpolation
-        if line.strip().lower().startswith('print'):
-            tokens.append('print')
-            
+        if stripped[:5].lower() == _KW_PRINT:
             # Everything after "print" is considered the print argument
-            print_arg = line[line.lower().find('print') + 5:].strip()
+            print_arg = stripped[5:].strip()
             if print_arg:
-                tokens.append(print_arg)
-            
-            return tokens
+                return [_KW_PRINT, sys.intern(print_arg)]
+            return [_KW_PRINT]
+        
+        # Without quoted strings the scanner below is a plain whitespace split
+        if '"' not in line:
+            return self.lower_keywords([sys.intern(token) for token in line.split()])
+        
+        tokens = []
+        i = 0
         
         while i < len(line):
             # Handle quoted strings
@@ -76,59 +529,83 @@ class SudoSharpInterpreter:
                 start = i
                 while i < len(line) and not line[i].isspace():
                     i += 1
-                tokens.append(line[start:i])
+                tokens.append(sys.intern(line[start:i]))
             else:
                 i += 1
         
+        return self.lower_keywords(tokens)
+
+    def lower_keywords(self, tokens):
+        """Lowercase the command and keyword positions of a token list in place"""
+        if not tokens:
+            return tokens
+        
+        command = tokens[0] = sys.intern(tokens[0].lower())
+        for index in KEYWORD_SLOTS.get(command, ()):
+            if index < len(tokens):
+                tokens[index] = sys.intern(tokens[index].lower())
+        
+        # 'by' is only a keyword after 'divided'; otherwise that slot is an operand
+        if command == _KW_SET and len(tokens) > 5 and tokens[4] == _KW_DIVIDED and tokens[5].lower() == _KW_BY:
+            tokens[5] = _KW_BY
         return tokens
 
     def process_string_interpolation(self, text):
         """Process string interpolation with $variable$ syntax"""
-        # Find all patterns of $variable$
-        pattern = r'\$([a-zA-Z0-9_]+)\$'
-        
-        def replace_var(match):
-            var_name = match.group(1)
-            if var_name in self.variables:
-                return str(self.variables[var_name])
-            return f"${var_name}$"  # Keep as is if variable not found
-            
-        # Replace all occurrences
-        return re.sub(pattern, replace_var, text)
+        variables = self.variables
+        parts = []
+        copied = 0  # end of the text already copied into parts
+        start = text.find('$')
+        while start != -1:
+            end = text.find('$', start + 1)
+            if end == -1:
+                break
+            var_name = text[start + 1:end]
+            if var_name and _NAME_CHARS.issuperset(var_name):
+                parts.append(text[copied:start])
+                if var_name in variables:
+                    parts.append(str(variables[var_name]))
+                else:
+                    parts.append(f"${var_name}$")  # Keep as is if variable not found
+                copied = end + 1
+                start = text.find('$', copied)
+            else:
+                start = end  # The closing '$' may open the next marker
+        
+        parts.append(text[copied:])
+        return ''.join(parts)
+
+    def render_template(self, template):
+        """Render a template from compile_template with the current variables"""
+        variables = self.variables
+        return ''.join([
+            fragment if kind == 'lit'
+            else str(variables[fragment]) if fragment in variables
+            else f"${fragment}$"  # Keep as is if variable not found
+            for kind, fragment in template
+        ])
 
     def evaluate_expression(self, expr):
         """Evaluate simple expressions"""
-        # Process string interpolation first
+        variables = self.variables
+        
+        # Process string interpolation first; the result varies, so it is never cached
         if isinstance(expr, str) and '$' in expr:
             expr = self.process_string_interpolation(expr)
+            if expr in variables:
+                return variables[expr]
+            return parse_literal(expr)
         
         # Handle variable references
-        if expr in self.variables:
-            return self.variables[expr]
+        if expr in variables:
+            return variables[expr]
         
-        # Handle quoted strings
-        if isinstance(expr, str) and expr.startswith('"') and expr.endswith('"'):
-            return expr[1:-1]
-        
-        # Handle numbers
-        try:
-            if isinstance(expr, str):
-                if '.' in expr:
-                    return float(expr)
-                else:
-                    return int(expr)
-            return expr  # Already a number
-        except ValueError:
-            pass
-        
-        # Handle boolean
-        if isinstance(expr, str):
-            if expr.lower() == "yes" or expr.lower() == "true":
-                return True
-            if expr.lower() == "no" or expr.lower() == "false":
-                return False
-            
-        return expr  # Return as is if nothing else matched
+        # Literal tokens always parse the same way
+        cache = self._literal_cache
+        value = cache.get(expr, _MISS)
+        if value is _MISS:
+            value = cache[expr] = parse_literal(expr)
+        return value
 
     def execute_print(self, tokens):
         """Execute print command"""
@@ -147,12 +624,9 @@ class SudoSharpInterpreter:
             print(tokens[1][1:-1])
             return
             
-        # Otherwise evaluate each token and print them concatenated
-        output = ""
-        for token in tokens[1:]:
-            value = self.evaluate_expression(token)
-            output += str(value) + " "
-        print(output.rstrip())
+        # Otherwise evaluate each token and print them space-separated
+        evaluate = self.evaluate_expression
+        print(' '.join([str(evaluate(token)) for token in tokens[1:]]).rstrip())
 
     def execute_set(self, tokens):
         """Execute variable assignment"""
@@ -163,57 +637,59 @@ class SudoSharpInterpreter:
         var_name = tokens[1]
         
         # Extract and evaluate the value
-        if tokens[2].lower() != "to":
+        if tokens[2] != _KW_TO:
             print("Error: Invalid set command format. Use 'set variable to value'")
             return
             
         value_tokens = tokens[3:]
+        variables = self.variables
+        evaluate = self.evaluate_expression
         
         # Handle simple assignment
         if len(value_tokens) == 1:
-            self.variables[var_name] = self.evaluate_expression(value_tokens[0])
+            variables[var_name] = evaluate(value_tokens[0])
             return
         
         # Handle math operations
         if len(value_tokens) >= 3:
-            left = self.evaluate_expression(value_tokens[0])
-            op = value_tokens[1].lower()
+            left = evaluate(value_tokens[0])
+            op = value_tokens[1]
             
             # Handle division which has a different syntax
-            if op == "divided" and len(value_tokens) >= 3 and value_tokens[2].lower() == "by":
+            if op == _KW_DIVIDED and len(value_tokens) >= 3 and value_tokens[2] == _KW_BY:
                 if len(value_tokens) < 4:
                     print("Error: Invalid division format. Use 'divided by value'")
                     return
-                right = self.evaluate_expression(value_tokens[3])
+                right = evaluate(value_tokens[3])
                 if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
                     print(f"Error: Cannot perform division on non-numeric values: {left} and {right}")
                     return
                 if right == 0:
                     print("Error: Division by zero")
                     return
-                self.variables[var_name] = left / right
+                variables[var_name] = left / right
                 return
                 
             # Handle other operations
-            right = self.evaluate_expression(value_tokens[2])
+            right = evaluate(value_tokens[2])
             
             if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
                 print(f"Error: Cannot perform math operations on non-numeric values: {left} and {right}")
                 return
                 
-            if op == "plus":
-                self.variables[var_name] = left + right
-            elif op == "minus":
-                self.variables[var_name] = left - right
-            elif op == "times":
-                self.variables[var_name] = left * right
+            if op == _KW_PLUS:
+                variables[var_name] = left + right
+            elif op == _KW_MINUS:
+                variables[var_name] = left - right
+            elif op == _KW_TIMES:
+                variables[var_name] = left * right
             else:
                 print(f"Error: Unknown operation '{op}'")
                 return
 
     def execute_ask(self, tokens):
         """Execute input command"""
-        if len(tokens) < 3 or tokens[1].lower() != "for":
+        if len(tokens) < 3 or tokens[1] != _KW_FOR:
             print("Error: Invalid ask command format. Use 'ask for variable'")
             return
             
@@ -235,7 +711,7 @@ class SudoSharpInterpreter:
             print("Error: Invalid loop command format. Use 'loop through start and end'")
             return
             
-        if tokens[1].lower() != "through" or tokens[3].lower() != "and":
+        if tokens[1] != _KW_THROUGH or tokens[3] != _KW_AND:
             print("Error: Invalid loop command format. Use 'loop through start and end'")
             return
             
@@ -244,11 +720,9 @@ class SudoSharpInterpreter:
             end = int(self.evaluate_expression(tokens[4]))
             
             # Save the current position and the range
-            self.loop_stack.append({
-                "start": self.current_line,
-                "iterator": start,
-                "end": end
-            })
+            self.loop_starts.append(self.current_line)
+            self.loop_iters.append(start)
+            self.loop_ends.append(end)
             
             # Set the loop variable 'i'
             self.variables["i"] = start
@@ -258,22 +732,26 @@ class SudoSharpInterpreter:
 
     def execute_end_loop(self):
         """Execute end loop command"""
-        if not self.loop_stack:
+        loop_iters = self.loop_iters
+        if not loop_iters:
             print("Error: 'end loop' without matching 'loop'")
             return
             
-        loop_info = self.loop_stack[-1]
-        loop_info["iterator"] += 1
+        top = len(loop_iters) - 1
+        iterator = loop_iters[top] + 1
+        loop_iters[top] = iterator
         
         # Update the loop variable 'i'
-        self.variables["i"] = loop_info["iterator"]
+        self.variables["i"] = iterator
         
-        if loop_info["iterator"] <= loop_info["end"]:
+        if iterator <= self.loop_ends[top]:
             # Continue loop
-            self.current_line = loop_info["start"]
+            self.current_line = self.loop_starts[top]
         else:
             # End loop
-            self.loop_stack.pop()
+            self.loop_starts.pop()
+            loop_iters.pop()
+            self.loop_ends.pop()
 
     def execute_import(self, tokens):
         """Import built-in modules or custom code"""
@@ -281,98 +759,236 @@ class SudoSharpInterpreter:
             print("Error: Invalid import command. Use 'import module'")
             return
             
-        module_name = tokens[1].lower()
-        
-        if module_name == "math":
-            # Import common math functions
-            self.variables["sin"] = math.sin
-            self.variables["cos"] = math.cos
-            self.variables["tan"] = math.tan
-            self.variables["sqrt"] = math.sqrt
-            self.variables["log"] = math.log
-            self.variables["floor"] = math.floor
-            self.variables["ceil"] = math.ceil
-            print(f"Imported math module")
+        module_name = tokens[1]
+        
+        if module_name == _KW_MATH:
+            self.import_math()
         else:
             print(f"Error: Module '{module_name}' not found")
 
+    def import_math(self):
+        """Import common math functions"""
+        self.variables.update(MATH_FUNCTIONS)
+        print(f"Imported math module")
+
     def execute_if(self, tokens):
         """Execute if statement (simplified)"""
         # Placeholder for future implementation
         print("If statements are not yet implemented")
 
-    def execute_line(self, line):
-        """Execute a single line of code"""
+    def prepare_line(self, line):
+        """Strip a source line and tokenize it, returning [] for blank and comment lines"""
         line = line.strip()
         
         # Skip empty lines
         if not line:
-            return
+            return []
             
         # Skip comments that start with # or $
-        if line.startswith('#') or (line.startswith('$') and not line.lower().startswith('$print')):
-            return
+        first = line[:1]
+        if first == '#' or (first == '$' and line[:6].lower() != '$print'):
+            return []
         
-        tokens = self.tokenize(line)
+        return self.tokenize(line)
+
+    def execute_tokens(self, command, tokens):
+        """Execute an already tokenized line; command is its first token"""
+        handler = self._dispatch.get(command)
+        if handler:
+            handler(tokens)
+        else:
+            self._unknown(command)
+
+    def _execute_end(self, tokens):
+        """Execute end command; only 'end loop' is valid"""
+        if len(tokens) > 1 and tokens[1] == _KW_LOOP:
+            self.execute_end_loop()
+        else:
+            self._unknown(_KW_END)
+
+    def _execute_exit(self, tokens):
+        """Execute exit/quit command"""
+        self.running = False
+
+    def _execute_help(self, tokens):
+        """Execute help command"""
+        self.show_help()
+
+    def _unknown(self, command):
+        """Report an unknown command"""
+        print(f"Error: Unknown command '{command}'")
+
+    def execute_line(self, line):
+        """Execute a single line of code"""
+        tokens = self.prepare_line(line)
         if not tokens:
             return
             
-        command = tokens[0].lower()
-        
-        if command == "print":
-            self.execute_print(tokens)
-        elif command == "set":
-            self.execute_set(tokens)
-        elif command == "ask":
-            self.execute_ask(tokens)
-        elif command == "loop":
-            self.execute_loop(tokens)
-        elif command == "end" and len(tokens) > 1 and tokens[1].lower() == "loop":
-            self.execute_end_loop()
-        elif command == "import":
-            self.execute_import(tokens)
-        elif command == "if":
-            self.execute_if(tokens)
-        elif command == "exit" or command == "quit":
-            self.running = False
-        elif command == "help":
-            self.show_help()
-        else:
-            print(f"Error: Unknown command '{command}'")
+        self.execute_tokens(tokens[0], tokens)
 
     def show_help(self):
         """Show help information"""
-        print("\nSudoSharp Language Help")
-        print("======================")
-        print("Commands:")
-        print("  print [text/$variable$/etc] - Output text to console. Use $var$ for variable interpolation.")
-        print("  set variable to value - Assign a value to a variable")
-        print("  ask for variable - Get user input and store it in a variable")
-        print("  loop through start and end - Loop from start to end values")
-        print("  end loop - End a loop block")
-        print("  import module - Import a module (currently only 'math' is supported)")
-        print("  exit/quit - Exit the program")
-        print("  help - Show this help message")
-        print("\nMath Operations:")
-        print("  set result to value1 plus value2")
-        print("  set result to value1 minus value2")
-        print("  set result to value1 times value2")
-        print("  set result to value1 divided by value2")
-        print("\nBuilt-in Functions:")
-        print("  abs, max, min, sum, round, pow, int, float, str, len, sort")
-        print("\nComments:")
-        print("  $ This is a comment")
-        print("  # This is also a comment")
+        sys.stdout.write(_HELP_TEXT)
 
     def run_program(self, program):
-        """Run a multi-line program"""
-        self.program_lines = program.strip().split('\n')
+        """Run a multi-line program, given as source text or a list of lines"""
+        if isinstance(program, str):
+            program = program.strip().split('\n')
+        self.program_lines = program
         self.current_line = 0
         
-        while self.current_line < len(self.program_lines) and self.running:
-            line = self.program_lines[self.current_line]
-            self.execute_line(line)
-            self.current_line += 1
+        # Compile once, then execute the bytecode
+        self.compiled = Compiler(self).compile(self.program_lines)
+        if self.running:
+            self.run_bytecode(*self.compiled)
+
+    def run_bytecode(self, code, consts, names, defaults):
+        """Execute compiled bytecode"""
+        variables = self.variables
+        self._write = sys.stdout.write
+        write = self._write
+        stack = [None] * 256
+        sp = 0
+        # The innermost loop lives in locals; enclosing loops are spilled to
+        # parallel stacks of body ip, iterator and end value
+        in_loop = False
+        loop_body = loop_iter = loop_end = 0
+        loop_bodies = []
+        loop_iters = []
+        loop_ends = []
+        ip = 0
+        code_len = len(code)
+        
+        while ip < code_len:
+            op = code[ip]
+            arg = code[ip + 1]
+            ip += 2
+            
+            if op == OP_LOAD_VAR:
+                try:
+                    stack[sp] = variables[names[arg]]
+                except KeyError:
+                    stack[sp] = defaults[arg]
+                sp += 1
+            elif op == OP_LOAD_CONST:
+                stack[sp] = consts[arg]
+                sp += 1
+            elif op == OP_STORE_VAR:
+                sp -= 1
+                variables[names[arg]] = stack[sp]
+            elif op == OP_STORE_CONST:
+                name, value = consts[arg]
+                variables[name] = value
+            elif op == OP_ADD or op == OP_SUB or op == OP_MUL:
+                sp -= 2
+                left = stack[sp]
+                right = stack[sp + 1]
+                if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+                    print(f"Error: Cannot perform math operations on non-numeric values: {left} and {right}")
+                elif op == OP_ADD:
+                    variables[names[arg]] = left + right
+                elif op == OP_SUB:
+                    variables[names[arg]] = left - right
+                else:
+                    variables[names[arg]] = left * right
+            elif op == OP_END_LOOP:
+                if not in_loop:
+                    print("Error: 'end loop' without matching 'loop'")
+                    continue
+                loop_iter += 1
+                variables["i"] = loop_iter
+                if loop_iter <= loop_end:
+                    ip = loop_body
+                elif loop_bodies:
+                    loop_body = loop_bodies.pop()
+                    loop_iter = loop_iters.pop()
+                    loop_end = loop_ends.pop()
+                else:
+                    in_loop = False
+            elif op == OP_PRINT_LITERAL:
+                write(consts[arg])
+            elif op == OP_PRINT_INTERP:
+                print(self.render_template(consts[arg]))
+            elif op == OP_LOAD_INTERP:
+                text = self.render_template(consts[arg])
+                stack[sp] = variables[text] if text in variables else parse_literal(text)
+                sp += 1
+            elif op == OP_PRINT_VALUE:
+                sp -= 1
+                print(str(stack[sp]).rstrip())
+            elif op == OP_DIV:
+                sp -= 2
+                left = stack[sp]
+                right = stack[sp + 1]
+                if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+                    print(f"Error: Cannot perform division on non-numeric values: {left} and {right}")
+                elif right == 0:
+                    print("Error: Division by zero")
+                else:
+                    variables[names[arg]] = left / right
+            elif op == OP_BAD_OP:
+                sp -= 2
+                left = stack[sp]
+                right = stack[sp + 1]
+                if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+                    print(f"Error: Cannot perform math operations on non-numeric values: {left} and {right}")
+                else:
+                    print(f"Error: Unknown operation '{consts[arg]}'")
+            elif op == OP_LOOP:
+                sp -= 2
+                try:
+                    start = int(stack[sp])
+                    end = int(stack[sp + 1])
+                except ValueError:
+                    print(consts[arg])
+                    continue
+                if in_loop:
+                    loop_bodies.append(loop_body)
+                    loop_iters.append(loop_iter)
+                    loop_ends.append(loop_end)
+                in_loop = True
+                loop_body, loop_iter, loop_end = ip, start, end
+                variables["i"] = start
+            elif op == OP_LOOP_SUM:
+                sp -= 2
+                error, target, exit_ip = consts[arg]
+                try:
+                    start = int(stack[sp])
+                    end = int(stack[sp + 1])
+                except ValueError:
+                    print(error)
+                    continue
+                total = variables.get(names[target])
+                if isinstance(total, int):
+                    # The body always runs at least once, like the generic loop
+                    last = end if end > start else start
+                    variables[names[target]] = total + sum_range(start, last)
+                    variables["i"] = last + 1
+                    ip = exit_ip
+                    continue
+                if in_loop:
+                    loop_bodies.append(loop_body)
+                    loop_iters.append(loop_iter)
+                    loop_ends.append(loop_end)
+                in_loop = True
+                loop_body, loop_iter, loop_end = ip, start, end
+                variables["i"] = start
+            elif op == OP_ASK:
+                user_input = input("> ")
+                try:
+                    if '.' in user_input:
+                        variables[names[arg]] = float(user_input)
+                    else:
+                        variables[names[arg]] = int(user_input)
+                except ValueError:
+                    variables[names[arg]] = user_input
+            elif op == OP_IMPORT_MATH:
+                self.import_math()
+            elif op == OP_HELP:
+                self.show_help()
+            elif op == OP_EXIT:
+                self.running = False
+                return
 
     def run_interactive(self):
         """Run the interpreter in interactive mode"""
@@ -396,7 +1012,7 @@ class SudoSharpInterpreter:
                             break
                         multi_line.append(next_line)
                     
-                    self.run_program('\n'.join(multi_line))
+                    self.run_program(multi_line)
                 else:
                     self.execute_line(line)
                     
@@ -416,7 +1032,7 @@ def main():
         # Run the file provided as argument
         try:
             with open(sys.argv[1], 'r') as f:
-                program = f.read()
+                program = [line.rstrip('\n') for line in f]
             interpreter.run_program(program)
         except FileNotFoundError:
             print(f"Error: File '{sys.argv[1]}' not found")